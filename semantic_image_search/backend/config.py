@@ -1,5 +1,7 @@
 import os
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 from semantic_image_search.backend.logger import GLOBAL_LOGGER as log
 from semantic_image_search.backend.exception.custom_exception import SemanticImageSearchException
@@ -28,61 +30,142 @@ else:
     log.warning(".env file not found", env_path=str(env_path))
 
 
-class Config:
+# ------------------------------------------------------------
+# 3) Snapshot the environment once
+# ------------------------------------------------------------
+_ENV = dict(os.environ)
+
+# Server worker processes. gunicorn and uvicorn both default their worker
+# count to WEB_CONCURRENCY, so set it instead of passing -w/--workers;
+# a -w flag is invisible here and the CPU split below would be wrong.
+_WORKERS = max(1, int(_ENV.get("WEB_CONCURRENCY", 1)))
+
+# CPUs this process may actually run on (respects taskset/cgroup pinning)
+_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     BASE_DIR: Path = BASE_DIR
 
     # ------------------- PATHS -------------------
-    IMAGES_ROOT: Path = Path(os.getenv("IMAGES_ROOT", BASE_DIR / "images"))
-    log.info("IMAGES_ROOT configured", value=str(IMAGES_ROOT))
+    IMAGES_ROOT: Path = Path(_ENV.get("IMAGES_ROOT", BASE_DIR / "images"))
+    RETRIEVED_ROOT: Path = Path(_ENV.get("RETRIEVED_ROOT", BASE_DIR / "data/retrieved"))
 
-    QUERY_IMAGE_ROOT: Path = Path(os.getenv("QUERY_IMAGE_ROOT", BASE_DIR / "data/query_images"))
-    log.info("QUERY_IMAGE_ROOT configured", value=str(QUERY_IMAGE_ROOT))
-
-    RETRIEVED_ROOT: Path = Path(os.getenv("RETRIEVED_ROOT", BASE_DIR / "data/retrieved"))
-    log.info("RETRIEVED_ROOT configured", value=str(RETRIEVED_ROOT))
+    # Longest side (px) of re-encoded result thumbnails
+    THUMBNAIL_SIZE: int = int(_ENV.get("THUMBNAIL_SIZE", 512))
 
     # ------------------- CLIP ---------------------
-    CLIP_MODEL_NAME: str = os.getenv("CLIP_MODEL_NAME", "ViT-B-32")
-    log.info("CLIP_MODEL_NAME loaded", value=CLIP_MODEL_NAME)
+    CLIP_MODEL_NAME: str = _ENV.get("CLIP_MODEL_NAME", "ViT-B-32")
+    CLIP_CHECKPOINT: str = _ENV.get("CLIP_CHECKPOINT", "laion2b_s34b_b79k")
+    DEVICE: str = _ENV.get("DEVICE", "cpu")
+
+    # Per-worker CPU budget: torch intra-op threads and the image decode pool.
+    # Split across worker processes so N workers don't oversubscribe the cores.
+    TORCH_THREADS: int = int(_ENV.get("TORCH_THREADS", max(1, _CPUS // _WORKERS)))
+
+    # Load CLIP when the API module is imported. Under
+    # `WEB_CONCURRENCY=N gunicorn -k uvicorn.workers.UvicornWorker --preload`
+    # (no -w) that happens once in the master and workers share the weights
+    # copy-on-write after fork.
+    PRELOAD_MODEL: bool = _ENV.get("PRELOAD_MODEL", "false").lower() in ("1", "true", "yes")
+
+    # "torch" (default) or "onnx" (int8 ONNX Runtime, CPU only)
+    EMBED_BACKEND: str = _ENV.get("EMBED_BACKEND", "torch").lower()
+    ONNX_DIR: Path = Path(_ENV.get("ONNX_DIR", BASE_DIR / "models/onnx"))
+
+    # CLIP weights precision: "fp32" (default), "int8" (CPU only), "bf16", "fp16"
+    # or "auto" (int8 on CPU, bf16/fp16 on GPU). Changing it alters the vectors:
+    # reindex existing collections after switching.
+    EMBEDDING_DTYPE: str = _ENV.get("EMBEDDING_DTYPE", "fp32").lower()
 
-    CLIP_CHECKPOINT: str = os.getenv("CLIP_CHECKPOINT", "laion2b_s34b_b79k")
-    log.info("CLIP_CHECKPOINT loaded", value=CLIP_CHECKPOINT)
+    # Images per CLIP forward pass during ingestion; 32 was the fastest
+    # setting in a 1 → 64 sweep on CPU.
+    EMBED_BATCH_SIZE: int = int(_ENV.get("EMBED_BATCH_SIZE", 32))
 
-    DEVICE: str = os.getenv("DEVICE", "cpu")
-    log.info("DEVICE selected", value=DEVICE)
+    # Online micro-batching: concurrent search requests are fused into one
+    # CLIP pass of up to EMBED_MAX_BATCH items, waiting at most EMBED_MAX_WAIT_MS
+    EMBED_MAX_BATCH: int = int(_ENV.get("EMBED_MAX_BATCH", 32))
+    EMBED_MAX_WAIT_MS: float = float(_ENV.get("EMBED_MAX_WAIT_MS", 10))
+
+    # Optional on-disk text embedding cache (needs the "cache" extra); unset disables it
+    CACHE_DIR: Optional[Path] = Path(_ENV["CACHE_DIR"]) if _ENV.get("CACHE_DIR") else None
 
     # ------------------- QDRANT -------------------
-    QDRANT_URL: str = os.getenv("QDRANT_URL")
-    if QDRANT_URL:
-        log.info("QDRANT_URL loaded", value=QDRANT_URL)
-    else:
-        log.warning("QDRANT_URL missing in environment")
+    QDRANT_URL: Optional[str] = _ENV.get("QDRANT_URL")
+    QDRANT_API_KEY: Optional[str] = _ENV.get("QDRANT_API_KEY")
+    QDRANT_COLLECTION: str = _ENV.get("QDRANT_COLLECTION", "semantic-image-search")
+
+    # gRPC keeps one persistent HTTP/2 connection; falls back to REST if unreachable
+    QDRANT_PREFER_GRPC: bool = _ENV.get("QDRANT_PREFER_GRPC", "true").lower() in ("1", "true", "yes")
+    QDRANT_GRPC_PORT: int = int(_ENV.get("QDRANT_GRPC_PORT", 6334))
+    QDRANT_TIMEOUT: int = int(_ENV.get("QDRANT_TIMEOUT", 30))
+    VECTOR_SIZE: int = int(_ENV.get("VECTOR_SIZE", 512))
+
+    # Payload keys the search API filters on (comma-separated); each gets a keyword index
+    KNOWN_FILTER_KEYS: tuple = tuple(
+        key.strip() for key in _ENV.get("KNOWN_FILTER_KEYS", "category").split(",") if key.strip()
+    )
+
+    # "binary" (default) or "scalar" (int8) quantization for new collections
+    QDRANT_QUANTIZATION: str = _ENV.get("QDRANT_QUANTIZATION", "binary").lower()
+
+    # Keep the HNSW graph of new collections on disk (default: in RAM)
+    HNSW_ON_DISK: bool = _ENV.get("HNSW_ON_DISK", "false").lower() in ("1", "true", "yes")
 
-    QDRANT_API_KEY: str = os.getenv("QDRANT_API_KEY")
-    if QDRANT_API_KEY:
-        log.info("QDRANT_API_KEY loaded (hidden)")
-    else:
-        log.warning("QDRANT_API_KEY missing in environment")
+    # Candidates fetched per requested result before full-precision rescoring;
+    # binary quantization needs more than int8 to recover recall
+    QUANTIZATION_OVERSAMPLING: float = float(_ENV.get("QUANTIZATION_OVERSAMPLING", 3.0))
 
-    QDRANT_COLLECTION: str = os.getenv("QDRANT_COLLECTION", "semantic-image-search")
-    log.info("QDRANT_COLLECTION loaded", value=QDRANT_COLLECTION)
+    # Bulk uploader settings for folder ingestion: points per request and
+    # number of parallel upload workers.
+    UPLOAD_BATCH_SIZE: int = int(_ENV.get("UPLOAD_BATCH_SIZE", 64))
+    UPLOAD_PARALLEL: int = int(_ENV.get("UPLOAD_PARALLEL", 4))
 
-    VECTOR_SIZE: int = int(os.getenv("VECTOR_SIZE", 512))
-    log.info("VECTOR_SIZE loaded", value=VECTOR_SIZE)
+    # Indexing threshold (KB) restored after a bulk ingest.
+    INDEXING_THRESHOLD: int = int(_ENV.get("INDEXING_THRESHOLD", 20000))
 
     # ------------------- OPENAI -------------------
-    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-    log.info("OPENAI_MODEL loaded", value=OPENAI_MODEL)
+    OPENAI_MODEL: str = _ENV.get("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_API_KEY: Optional[str] = _ENV.get("OPENAI_API_KEY")
 
-    OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
-    if not OPENAI_API_KEY:
-        log.warning("OPENAI_API_KEY missing")
+
+# Single shared, immutable settings instance
+Config = Settings()
+
+
+# ------------------------------------------------------------
+# 4) One summary log instead of one event per setting
+# ------------------------------------------------------------
+if not Config.QDRANT_URL:
+    log.warning("QDRANT_URL missing in environment")
+
+if not Config.QDRANT_API_KEY:
+    log.warning("QDRANT_API_KEY missing in environment")
+
+if not Config.OPENAI_API_KEY:
+    log.warning("OPENAI_API_KEY missing")
+
+log.info(
+    "Config loaded",
+    images_root=str(Config.IMAGES_ROOT),
+    clip_model=Config.CLIP_MODEL_NAME,
+    clip_checkpoint=Config.CLIP_CHECKPOINT,
+    device=Config.DEVICE,
+    embed_backend=Config.EMBED_BACKEND,
+    embedding_dtype=Config.EMBEDDING_DTYPE,
+    torch_threads=Config.TORCH_THREADS,
+    qdrant_url=Config.QDRANT_URL,
+    qdrant_prefer_grpc=Config.QDRANT_PREFER_GRPC,
+    qdrant_collection=Config.QDRANT_COLLECTION,
+    vector_size=Config.VECTOR_SIZE,
+    openai_model=Config.OPENAI_MODEL,
+)
 
 
 # ------------------------------------------------------------
-# 7) Final global config success log
+# 5) Final global config success log
 # ------------------------------------------------------------
 if __name__== "__main__":
-    config = Config()
     log.info("Config initialized successfully", status="OK")
-    print(config.VECTOR_SIZE)
+    print(Config.VECTOR_SIZE)
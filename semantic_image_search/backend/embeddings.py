@@ -1,15 +1,38 @@
 import os
-import sys
-from typing import List
-from langchain_experimental.open_clip import OpenCLIPEmbeddings
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+import open_clip
+import torch
+from PIL import Image
+
 from semantic_image_search.backend.config import Config
 from semantic_image_search.backend.logger import GLOBAL_LOGGER as log
 from semantic_image_search.backend.exception.custom_exception import SemanticImageSearchException
 
 
+_TORCH_DTYPES = {
+    "fp32": torch.float32,
+    "fp16": torch.float16,
+    "bf16": torch.bfloat16,
+}
+
+
+# A file path, or an already opened PIL image (e.g. an in-memory upload)
+ImageInput = Union[str, Image.Image]
+
+
 class EmbeddingLoader:
     """
     Loads and manages CLIP embedding models.
+    Talks to open_clip directly so a whole image batch goes through one
+    forward pass, with decode/preprocess spread over a thread pool.
     """
 
     def __init__(self):
@@ -18,16 +41,41 @@ class EmbeddingLoader:
                 "Initializing CLIP Embedding Loader",
                 model=Config.CLIP_MODEL_NAME,
                 checkpoint=Config.CLIP_CHECKPOINT,
-                device=Config.DEVICE
+                device=Config.DEVICE,
+                backend=Config.EMBED_BACKEND,
+                torch_threads=Config.TORCH_THREADS
             )
 
-            self.embedder = OpenCLIPEmbeddings(
-                model_name=Config.CLIP_MODEL_NAME,
-                checkpoint=Config.CLIP_CHECKPOINT,
-                device=Config.DEVICE
+            torch.set_num_threads(Config.TORCH_THREADS)
+
+            self.device = Config.DEVICE
+            self.model, _, self.preprocess = open_clip.create_model_and_transforms(
+                Config.CLIP_MODEL_NAME,
+                pretrained=Config.CLIP_CHECKPOINT,
+                device=self.device,
+            )
+            self.model.eval()
+            self.model.to(memory_format=torch.channels_last)
+            self.precision = self._apply_precision()
+            self.tokenizer = open_clip.get_tokenizer(Config.CLIP_MODEL_NAME)
+
+            # Optional int8 ONNX Runtime backend for CPU inference
+            self.onnx = None
+            if Config.EMBED_BACKEND == "onnx":
+                from semantic_image_search.backend.onnx_backend import OnnxClipEncoder
+                self.onnx = OnnxClipEncoder(self.model)
+
+            # PIL decode/resize releases the GIL, so threads scale across cores;
+            # sized from the same per-worker budget as torch
+            self.decode_pool = ThreadPoolExecutor(
+                max_workers=Config.TORCH_THREADS,
+                thread_name_prefix="clip-decode",
             )
 
-            log.info("CLIP Embedding Model Loaded Successfully")
+            # Fail at startup, not on the first query, if the precision/backend is broken
+            self._encode_texts(["warmup"])
+
+            log.info("CLIP Embedding Model Loaded Successfully", precision=self.precision)
 
         except Exception as e:
             log.error(
@@ -38,6 +86,73 @@ class EmbeddingLoader:
             )
             raise SemanticImageSearchException("Error loading CLIP Embedding Model", e)
 
+    # ---------------------------------------------------------
+    # MODEL HELPERS
+    # ---------------------------------------------------------
+    def _apply_precision(self) -> str:
+        """Cast or quantize the model per Config.EMBEDDING_DTYPE and return the precision used."""
+        precision = Config.EMBEDDING_DTYPE
+        on_cuda = self.device.startswith("cuda")
+
+        if Config.EMBED_BACKEND == "onnx":
+            # The ONNX export runs in fp32 and is quantized by onnxruntime itself
+            precision = "fp32"
+        elif precision == "auto":
+            if on_cuda:
+                precision = "bf16" if torch.cuda.is_bf16_supported() else "fp16"
+            else:
+                precision = "int8"
+
+        if precision == "int8":
+            if on_cuda:
+                raise ValueError("EMBEDDING_DTYPE=int8 is only supported on CPU")
+
+            # int8 weights for the image tower's Linears, activations stay fp32.
+            # The text transformer stays float: encode_text reads
+            # mlp.c_fc.weight.dtype, which quantized Linears no longer expose.
+            self.model.visual = torch.ao.quantization.quantize_dynamic(
+                self.model.visual, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            self.dtype = torch.float32
+            return precision
+
+        if precision not in _TORCH_DTYPES:
+            raise ValueError(f"Unsupported EMBEDDING_DTYPE: {precision}")
+
+        self.dtype = _TORCH_DTYPES[precision]
+        self.model.to(dtype=self.dtype)
+        return precision
+
+    def _load_image(self, image: ImageInput) -> torch.Tensor:
+        if isinstance(image, Image.Image):
+            return self.preprocess(image.convert("RGB"))
+
+        with Image.open(image) as img:
+            return self.preprocess(img.convert("RGB"))
+
+    @torch.inference_mode()
+    def _encode_images(self, image_paths: List[ImageInput]) -> List[List[float]]:
+        pixels = torch.stack(list(self.decode_pool.map(self._load_image, image_paths)))
+
+        if self.onnx is not None:
+            features = torch.from_numpy(self.onnx.encode_image(pixels.numpy()))
+        else:
+            pixels = pixels.to(self.device, dtype=self.dtype, memory_format=torch.channels_last)
+            features = self.model.encode_image(pixels)
+        features = features / features.norm(dim=-1, keepdim=True)
+        return features.float().cpu().tolist()
+
+    @torch.inference_mode()
+    def _encode_texts(self, texts: List[str]) -> List[List[float]]:
+        tokens = self.tokenizer(texts)
+
+        if self.onnx is not None:
+            features = torch.from_numpy(self.onnx.encode_text(tokens.numpy()))
+        else:
+            features = self.model.encode_text(tokens.to(self.device))
+        features = features / features.norm(dim=-1, keepdim=True)
+        return features.float().cpu().tolist()
+
     # ---------------------------------------------------------
     # TEXT → VECTOR
     # ---------------------------------------------------------
@@ -45,43 +160,72 @@ class EmbeddingLoader:
         if not text:
             raise ValueError("Text cannot be empty for embedding")
 
-        log.info("Embedding text", text_preview=text[:40])
+        debug = log.isEnabledFor(logging.DEBUG)
+        if debug:
+            log.debug("Embedding text", text_preview=text[:40])
 
         try:
-            vec = self.embedder.embed_query(text)
-            log.info("Text embedding successful", vector_dim=len(vec))
+            vec = self._encode_texts([text])[0]
+            if debug:
+                log.debug("Text embedding successful", vector_dim=len(vec))
             return vec
 
         except Exception as e:
             log.error("Error embedding text", text_preview=text[:40], error=str(e))
             raise SemanticImageSearchException("Failed to embed text", e)
 
+    # ---------------------------------------------------------
+    # BATCH TEXT EMBEDDINGS
+    # ---------------------------------------------------------
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        if not texts or not all(texts):
+            raise ValueError("Texts cannot be empty for embedding")
+
+        debug = log.isEnabledFor(logging.DEBUG)
+        if debug:
+            log.debug("Embedding batch texts", total_texts=len(texts))
+
+        try:
+            vectors = self._encode_texts(texts)
+            if debug:
+                log.debug("Batch text embedding successful", total_texts=len(vectors))
+            return vectors
+
+        except Exception as e:
+            log.error("Error embedding batch texts", total_texts=len(texts), error=str(e))
+            raise SemanticImageSearchException("Failed to embed text batch", e)
+
     # ---------------------------------------------------------
     # IMAGE → VECTOR
     # ---------------------------------------------------------
-    def embed_image(self, image_path: str) -> List[float]:
-        log.info("Embedding single image", image=image_path)
+    def embed_image(self, image_path: ImageInput) -> List[float]:
+        debug = log.isEnabledFor(logging.DEBUG)
+        if debug:
+            log.debug("Embedding single image", image=str(image_path))
 
         try:
-            vectors = self.embedder.embed_image([image_path])
-            vec = vectors[0]
+            vec = self._encode_images([image_path])[0]
 
-            log.info("Single image embedding successful", vector_dim=len(vec))
+            if debug:
+                log.debug("Single image embedding successful", vector_dim=len(vec))
             return vec
 
         except Exception as e:
-            log.error("Error embedding image", image=image_path, error=str(e))
+            log.error("Error embedding image", image=str(image_path), error=str(e))
             raise SemanticImageSearchException("Failed to embed image", e)
 
     # ---------------------------------------------------------
     # BATCH IMAGE EMBEDDINGS
     # ---------------------------------------------------------
-    def embed_images(self, image_paths: List[str]) -> List[List[float]]:
-        log.info("Embedding batch images", total_images=len(image_paths))
+    def embed_images(self, image_paths: List[ImageInput]) -> List[List[float]]:
+        debug = log.isEnabledFor(logging.DEBUG)
+        if debug:
+            log.debug("Embedding batch images", total_images=len(image_paths))
 
         try:
-            vectors = self.embedder.embed_image(image_paths)
-            log.info("Batch image embedding successful", total_images=len(vectors))
+            vectors = self._encode_images(image_paths)
+            if debug:
+                log.debug("Batch image embedding successful", total_images=len(vectors))
             return vectors
 
         except Exception as e:
@@ -97,18 +241,132 @@ class EmbeddingLoader:
 # OPTIONAL: LAZY SINGLETON
 # -------------------------------------------------------------
 _embedding_loader = None
+_loader_lock = threading.Lock()
 
 
 def get_loader() -> EmbeddingLoader:
     global _embedding_loader
     if _embedding_loader is None:
-        _embedding_loader = EmbeddingLoader()
+        # Request threads and the batching worker may race on first use
+        with _loader_lock:
+            if _embedding_loader is None:
+                _embedding_loader = EmbeddingLoader()
     return _embedding_loader
 
 
+def preload_loader():
+    """Load CLIP eagerly (pre-fork) when it is safe to share with forked workers."""
+    # ONNX Runtime thread pools and CUDA contexts do not survive fork()
+    if Config.EMBED_BACKEND != "torch" or Config.DEVICE != "cpu":
+        log.warning(
+            "Skipping CLIP preload, only the torch CPU backend is fork-safe",
+            backend=Config.EMBED_BACKEND,
+            device=Config.DEVICE,
+        )
+        return
+
+    log.info("Preloading CLIP model", pid=os.getpid())
+    get_loader()
+
+
+class _LRUCache:
+    """Small thread-safe LRU map shared by the sync and async text paths."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: np.ndarray):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+# Identical captions skip the CLIP text tower. Vectors are kept as
+# read-only float32 arrays so the shared value can't be mutated by callers.
+_text_cache = _LRUCache(maxsize=4096)
+
+
+def _open_disk_cache():
+    """Optional on-disk tier so cached queries survive restarts and are shared across workers."""
+    if Config.CACHE_DIR is None:
+        return None
+
+    try:
+        import diskcache
+
+    except ImportError:
+        log.warning("diskcache is not installed, text embedding disk cache disabled")
+        return None
+
+    path = Config.CACHE_DIR / "text_embeddings"
+    log.info("Text embedding disk cache enabled", path=str(path))
+    return diskcache.Cache(str(path))
+
+
+_text_disk_cache = _open_disk_cache()
+
+
+def _text_cache_key(text: str) -> str:
+    # Vectors from another model/checkpoint/precision/backend must never be served
+    raw = (
+        f"{Config.CLIP_MODEL_NAME}:{Config.CLIP_CHECKPOINT}:"
+        f"{Config.EMBEDDING_DTYPE}:{Config.EMBED_BACKEND}:{text}"
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _read_disk_text(text: str) -> Optional[np.ndarray]:
+    """Disk-tier lookup (blocking SQLite read); hits are promoted to the LRU."""
+    if _text_disk_cache is None:
+        return None
+
+    raw = _text_disk_cache.get(_text_cache_key(text))
+    if raw is None:
+        return None
+
+    # frombuffer over bytes is already read-only
+    vector = np.frombuffer(raw, dtype=np.float32)
+    _text_cache.put(text, vector)
+    return vector
+
+
+def _write_disk_texts(items: List[Tuple[str, Any]]):
+    """Disk-tier store (blocking SQLite write), one transaction per batch."""
+    if _text_disk_cache is None:
+        return
+
+    with _text_disk_cache.transact():
+        for text, vector in items:
+            _text_disk_cache.set(_text_cache_key(text), np.asarray(vector, dtype=np.float32).tobytes())
+
+
+def _remember_text(text: str, vector: List[float]) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    vector.flags.writeable = False
+    _text_cache.put(text, vector)
+    return vector
+
+
 # Convenience API wrappers
-def embed_text(text: str) -> List[float]:
-    return get_loader().embed_text(text)
+def embed_text(text: str) -> np.ndarray:
+    vector = _text_cache.get(text)
+    if vector is None:
+        vector = _read_disk_text(text)
+    if vector is None:
+        vector = _remember_text(text, get_loader().embed_text(text))
+        _write_disk_texts([(text, vector)])
+    return vector
 
 
 def embed_single_image(image_path: str) -> List[float]:
@@ -117,3 +375,130 @@ def embed_single_image(image_path: str) -> List[float]:
 
 def embed_image_paths(image_paths: List[str]) -> List[List[float]]:
     return get_loader().embed_images(image_paths)
+
+
+# -------------------------------------------------------------
+# MICRO-BATCHING (ASYNC)
+# -------------------------------------------------------------
+class BatchingEmbedder:
+    """
+    Coalesces concurrent embedding requests into shared CLIP forward passes.
+    Requests wait at most `max_wait_ms` (or until `max_batch` are queued),
+    then each kind (text / image) is encoded as one batch off the event loop.
+    """
+
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _submit(self, kind: str, item: Any) -> List[float]:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((kind, item, future))
+        return await future
+
+    async def embed_text(self, text: str) -> np.ndarray:
+        if not text:
+            raise ValueError("Text cannot be empty for embedding")
+
+        # LRU lookup is in-memory and stays inline; the SQLite tier never
+        # runs on the event loop (reads here, writes in the batch worker)
+        vector = _text_cache.get(text)
+        if vector is None and _text_disk_cache is not None:
+            vector = await asyncio.to_thread(_read_disk_text, text)
+        if vector is None:
+            vector = _remember_text(text, await self._submit("text", text))
+        return vector
+
+    async def embed_image(self, image_path: ImageInput) -> List[float]:
+        return await self._submit("image", image_path)
+
+    async def _run(self):
+        while True:
+            pending = [await self._queue.get()]
+            deadline = self._loop.time() + self.max_wait
+
+            while len(pending) < self.max_batch:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(pending)
+
+    async def _flush(self, pending: List[Tuple[str, Any, asyncio.Future]]):
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Flushing embedding micro-batch", batch_size=len(pending))
+
+        try:
+            loader = await asyncio.to_thread(get_loader)
+        except Exception as e:
+            for _, _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for kind, encode in (("text", loader.embed_texts), ("image", loader.embed_images)):
+            group = [(item, future) for k, item, future in pending if k == kind]
+            if not group:
+                continue
+
+            try:
+                vectors = await asyncio.to_thread(encode, [item for item, _ in group])
+
+            except Exception as e:
+                if len(group) == 1:
+                    if not group[0][1].done():
+                        group[0][1].set_exception(e)
+                    continue
+
+                # One bad input (e.g. a corrupt upload) must not fail the
+                # requests it was batched with: retry each item on its own.
+                for item, future in group:
+                    try:
+                        vector = (await asyncio.to_thread(encode, [item]))[0]
+                        if not future.done():
+                            future.set_result(vector)
+                    except Exception as item_error:
+                        if not future.done():
+                            future.set_exception(item_error)
+                continue
+
+            for (_, future), vector in zip(group, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+            # Persist new text vectors after the waiters have their results
+            if kind == "text" and _text_disk_cache is not None:
+                try:
+                    await asyncio.to_thread(
+                        _write_disk_texts, [(item, vector) for (item, _), vector in zip(group, vectors)]
+                    )
+                except Exception as e:
+                    log.warning("Failed to write text embeddings to disk cache", error=str(e))
+
+
+_batching_embedder = None
+
+
+def get_batching_embedder() -> BatchingEmbedder:
+    global _batching_embedder
+    if _batching_embedder is None:
+        _batching_embedder = BatchingEmbedder(
+            max_batch=Config.EMBED_MAX_BATCH,
+            max_wait_ms=Config.EMBED_MAX_WAIT_MS,
+        )
+    return _batching_embedder
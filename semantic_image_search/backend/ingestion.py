@@ -1,6 +1,12 @@
 import os
-from uuid import uuid4
-from typing import Optional, List, Dict, Any
+import mmap
+import logging
+import asyncio
+import hashlib
+import threading
+from collections import deque
+from uuid import UUID, uuid5
+from typing import Optional, List, Dict, Any, Deque, Iterator, Tuple
 from qdrant_client.http import models
 
 from semantic_image_search.backend.config import Config
@@ -10,13 +16,77 @@ from semantic_image_search.backend.logger import GLOBAL_LOGGER as log
 from semantic_image_search.backend.exception.custom_exception import SemanticImageSearchException
 
 
+EXT_SET = frozenset({"jpg", "jpeg", "png", "webp"})
+
+
+def _iter_images(root: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Yield (path, filename, category) for every image under `root`.
+    Iterative os.scandir walk: no per-directory lists, and DirEntry
+    type checks reuse the data returned by the directory read.
+    """
+    stack = [root]
+
+    while stack:
+        folder = stack.pop()
+        category = os.path.basename(folder)
+
+        try:
+            entries = os.scandir(folder)
+        except OSError as e:
+            # Like os.walk: unreadable or missing directories are skipped
+            log.warning("Skipping unreadable directory", folder=folder, error=str(e))
+            continue
+
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1][1:].lower() in EXT_SET:
+                    yield entry.path, entry.name, category
+
+
+# Fixed namespace for point ids: the same file always maps to the same id
+POINT_ID_NAMESPACE = UUID("de6844b8-3e70-4994-875c-c119c498024f")
+
+
+def _file_hash(image_path: str) -> str:
+    """BLAKE2b digest of the file's bytes (read via mmap)."""
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(image_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+
+    return digest.hexdigest()
+
+
+def _point_id(image_path: str) -> str:
+    """
+    Deterministic point id: UUID5 of the file hash and its path.
+    The path is part of the key so identical files under different
+    categories stay separate points.
+    """
+    return str(uuid5(POINT_ID_NAMESPACE, f"{_file_hash(image_path)}:{image_path}"))
+
+
+def _pt(point_id: str, vec: List[float], payload: Dict[str, Any]) -> models.PointStruct:
+    """Build a point whose vector matches the collection's named-vector schema."""
+    return models.PointStruct(
+        id=point_id,
+        vector={QdrantClientManager.VECTOR_NAME: vec},
+        payload=payload,
+    )
+
+
 class IndexService:
     """
     Handles image indexing operations:
       - Single image indexing
       - Folder-wise batch indexing
       - Auto category inference
-      - Batch embedding (efficient)
+      - Batch embedding in fixed-size microbatches (efficient)
     """
 
     def __init__(self):
@@ -27,6 +97,13 @@ class IndexService:
             QdrantClientManager.ensure_collection()
 
             self.collection = Config.QDRANT_COLLECTION
+            self.batch_size = Config.EMBED_BATCH_SIZE
+            self.upload_batch_size = Config.UPLOAD_BATCH_SIZE
+            self.upload_parallel = Config.UPLOAD_PARALLEL
+
+            # Number of ingests currently inside the bulk window
+            self._bulk_depth = 0
+            self._bulk_lock = threading.Lock()
             log.info("IndexService initialized successfully", collection=self.collection)
 
         except Exception as e:
@@ -50,13 +127,7 @@ class IndexService:
 
             self.client.upsert(
                 collection_name=self.collection,
-                points=[
-                    models.PointStruct(
-                        id=str(uuid4()),
-                        vector=vec,
-                        payload=payload,
-                    )
-                ],
+                points=[_pt(_point_id(image_path), vec, payload)],
             )
 
             log.info("Single image indexed successfully", image=image_path)
@@ -68,69 +139,167 @@ class IndexService:
     # ---------------------------------------------------------
     # Batch (Folder) Index
     # ---------------------------------------------------------
+    def _embed_batch(self, batch: Deque[Tuple[str, Dict[str, Any]]]) -> List[models.PointStruct]:
+        """
+        Embed the buffered images into points, then empty the buffer.
+        Images whose point id is already in the collection are skipped,
+        so re-ingesting an unchanged tree costs one retrieve per batch.
+        """
+        point_ids = [_point_id(path) for path, _ in batch]
+
+        existing = {
+            str(point.id)
+            for point in self.client.retrieve(
+                collection_name=self.collection,
+                ids=point_ids,
+                with_payload=False,
+                with_vectors=False,
+            )
+        }
+
+        pending = [
+            (point_id, path, payload)
+            for point_id, (path, payload) in zip(point_ids, batch)
+            if point_id not in existing
+        ]
+        batch.clear()
+
+        if existing and log.isEnabledFor(logging.DEBUG):
+            log.debug("Skipping already indexed images", total_skipped=len(existing))
+
+        if not pending:
+            return []
+
+        vectors = embed_image_paths([path for _, path, _ in pending])
+
+        return [
+            _pt(point_id, vector, payload)
+            for vector, (point_id, _, payload) in zip(vectors, pending)
+        ]
+
+    def _iter_points(self, root_folder: str) -> Iterator[models.PointStruct]:
+        """Lazily embed the walked tree, `batch_size` images per CLIP call."""
+        batch: Deque[Tuple[str, Dict[str, Any]]] = deque()
+
+        # Batches span directory boundaries so CLIP always sees a full
+        # batch, and at most `batch_size` images are held in memory.
+        for path, filename, category in _iter_images(root_folder):
+            batch.append((path, {
+                "filename": filename,
+                "path": path,
+                "category": category,
+            }))
+            if len(batch) >= self.batch_size:
+                yield from self._embed_batch(batch)
+
+        if batch:
+            yield from self._embed_batch(batch)
+
     def index_folder(self, root_folder: str | os.PathLike):
         root_folder = str(root_folder)
-        log.info("Starting folder indexing", folder=root_folder)
+        log.info(
+            "Starting folder indexing",
+            folder=root_folder,
+            batch_size=self.batch_size,
+            upload_batch_size=self.upload_batch_size,
+            upload_parallel=self.upload_parallel,
+        )
 
-        exts = (".jpg", ".jpeg", ".png", ".webp")
-
-        for dirpath, _, files in os.walk(root_folder):
-            category = os.path.basename(dirpath)
+        try:
+            # The client's bulk uploader pulls from the generator, so CLIP
+            # embeds the next batch while its workers upload earlier ones.
+            self.client.upload_points(
+                collection_name=self.collection,
+                points=self._iter_points(root_folder),
+                batch_size=self.upload_batch_size,
+                parallel=self.upload_parallel,
+                wait=False,
+            )
 
-            image_paths: List[str] = []
-            payloads: List[Dict[str, Any]] = []
+            log.info("Folder indexed successfully", folder=root_folder)
 
-            for f in files:
-                if f.lower().endswith(exts):
-                    img_path = os.path.join(dirpath, f)
-                    image_paths.append(img_path)
-                    payloads.append({
-                        "filename": os.path.basename(img_path),
-                        "path": img_path,
-                        "category": category,
-                    })
+        except Exception as e:
+            log.error("Failed to index folder", folder=root_folder, error=str(e))
+            raise SemanticImageSearchException("Failed to index folder", e)
 
-            if not image_paths:
-                continue
+    async def aindex_folder(self, root_folder: str | os.PathLike):
+        await asyncio.to_thread(self.index_folder, root_folder)
 
-            log.info("Batch image collection completed",
-                     folder=dirpath, total_images=len(image_paths), category=category)
+    # ---------------------------------------------------------
+    # Bulk Mode (HNSW indexing paused)
+    # ---------------------------------------------------------
+    def begin_bulk(self):
+        """
+        Pause HNSW index building so bulk uploads don't trigger rebuilds.
+        Reference counted: overlapping ingests share one bulk window, and
+        only the last `end_bulk()` restores the threshold.
 
-            try:
-                vectors = embed_image_paths(image_paths)
+        The count is per process. Under several workers, one worker's
+        `end_bulk()` can restore the threshold while another worker is still
+        ingesting, so run concurrent ingests against a single worker.
+        """
+        with self._bulk_lock:
+            if self._bulk_depth == 0:
+                log.info("Entering bulk ingest mode", collection=self.collection)
 
-                points = [
-                    models.PointStruct(
-                        id=str(uuid4()),
-                        vector=vector,
-                        payload=payload,
+                try:
+                    self.client.update_collection(
+                        collection_name=self.collection,
+                        optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
                     )
-                    for vector, payload in zip(vectors, payloads)
-                ]
 
-                self.client.upsert(
+                except Exception as e:
+                    log.error("Failed to enter bulk ingest mode", error=str(e))
+                    raise SemanticImageSearchException("Failed to enter bulk ingest mode", e)
+
+            self._bulk_depth += 1
+
+    def end_bulk(self):
+        """Restore the indexing threshold; the optimizer then builds HNSW once."""
+        with self._bulk_lock:
+            self._bulk_depth -= 1
+            if self._bulk_depth > 0:
+                log.info("Bulk ingest still in progress", active_ingests=self._bulk_depth)
+                return
+
+            log.info(
+                "Leaving bulk ingest mode",
+                collection=self.collection,
+                indexing_threshold=Config.INDEXING_THRESHOLD,
+            )
+
+            try:
+                self.client.update_collection(
                     collection_name=self.collection,
-                    points=points,
+                    optimizers_config=models.OptimizersConfigDiff(
+                        indexing_threshold=Config.INDEXING_THRESHOLD
+                    ),
                 )
 
-                log.info("Folder indexed successfully",
-                         folder=dirpath, total_indexed=len(points))
-
             except Exception as e:
-                log.error("Failed to index folder", folder=dirpath, error=str(e))
-                raise SemanticImageSearchException("Failed to index folder", e)
+                log.error("Failed to leave bulk ingest mode", error=str(e))
+                raise SemanticImageSearchException("Failed to leave bulk ingest mode", e)
 
     # ---------------------------------------------------------
     # Clear Collection
     # ---------------------------------------------------------
-    def clear_collection(self):
-        log.warning("Clearing Qdrant collection", collection=self.collection)
+    def clear_collection(self, selective: bool = False):
+        """
+        Drop and recreate the collection (a metadata operation that frees
+        disk immediately). `selective=True` deletes points by filter instead,
+        keeping the collection and its config in place.
+        """
+        log.warning("Clearing Qdrant collection", collection=self.collection, selective=selective)
 
         try:
-            self.client.delete(
-                collection_name=self.collection,
-                filter=models.Filter(must=[]),
-            )
+            if selective:
+                self.client.delete(
+                    collection_name=self.collection,
+                    points_selector=models.FilterSelector(filter=models.Filter(must=[])),
+                )
+            else:
+                self.client.delete_collection(collection_name=self.collection)
+                QdrantClientManager.ensure_collection()
 
             log.info("Collection cleared", collection=self.collection)
 
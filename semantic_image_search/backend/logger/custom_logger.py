@@ -32,14 +32,18 @@ class CustomLogger:
         )
 
         # Configure structlog for JSON structured logging
+        # stdlib BoundLogger exposes isEnabledFor(), and filter_by_level drops
+        # disabled events before any further processing.
         structlog.configure(
             processors=[
+                structlog.stdlib.filter_by_level,
                 structlog.processors.TimeStamper(fmt="iso", utc=True, key="timestamp"),
                 structlog.processors.add_log_level,
                 structlog.processors.EventRenamer(to="event"),
                 structlog.processors.JSONRenderer()
             ],
             logger_factory=structlog.stdlib.LoggerFactory(),
+            wrapper_class=structlog.stdlib.BoundLogger,
             cache_logger_on_first_use=True,
         )
 
@@ -1,11 +1,14 @@
-import shutil
-from pathlib import Path
-from typing import Optional, Dict, Any
+import io
+import asyncio
+from typing import Optional, Dict, Any, List
 
+from PIL import Image
 from fastapi import FastAPI, UploadFile, File, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 
 from semantic_image_search.backend.config import Config
+from semantic_image_search.backend.embeddings import preload_loader
 from semantic_image_search.backend.query_translator import translate_query
 from semantic_image_search.backend.ingestion import IndexService
 from semantic_image_search.backend.retriever import ImageSearchService
@@ -23,6 +26,11 @@ app = FastAPI(
 search_service = None
 index_service = None
 
+# Load CLIP at import so a pre-forking server shares one copy of the weights.
+# Qdrant clients are still created per worker in the startup hook.
+if Config.PRELOAD_MODEL:
+    preload_loader()
+
 
 @app.on_event("startup")
 def init_services():
@@ -32,18 +40,38 @@ def init_services():
     log.info("Services initialized successfully")
 
 
+# ---------------------------------------------------------
+# HELPERS
+# ---------------------------------------------------------
+def _serialize_points(points) -> List[Dict[str, Any]]:
+    return [
+        {
+            "filename": p.payload.get("filename"),
+            "path": p.payload.get("path"),
+            "category": p.payload.get("category"),
+            "score": p.score,
+        }
+        for p in points
+    ]
+
+
 # ---------------------------------------------------------
 # INGEST ENDPOINT
 # ---------------------------------------------------------
 @app.post("/ingest")
-def ingest_images(
+async def ingest_images(
     folder_path: Optional[str] = Query(None, description="Folder of images to index"),
 ):
     folder = folder_path or str(Config.IMAGES_ROOT)
     log.info("Ingest request received", folder=folder)
 
     try:
-        index_service.index_folder(folder)
+        # Pause HNSW rebuilds while points stream in; rebuild once at the end.
+        await asyncio.to_thread(index_service.begin_bulk)
+        try:
+            await index_service.aindex_folder(folder)
+        finally:
+            await asyncio.to_thread(index_service.end_bulk)
         log.info("Ingestion completed", folder=folder)
         return {"message": f"Indexed images from {folder}"}
 
@@ -73,37 +101,33 @@ def translate(q: str):
 # TEXT SEARCH ENDPOINT
 # ---------------------------------------------------------
 @app.get("/search-text")
-def search_text_endpoint(
+async def search_text_endpoint(
     q: str,
     k: int = 5,
     category: Optional[str] = None,
+    score_threshold: Optional[float] = Query(None, description="Minimum cosine similarity"),
     save_results: bool = False,
 ):
     log.info("Text search request received", query=q, top_k=k, category=category)
 
     try:
-        translated = translate_query(q)
+        translated = await run_in_threadpool(translate_query, q)
         log.info("Query translated for text search", translated=translated)
 
         metadata_filter = {"category": category} if category else None
 
-        results = search_service.search_by_text(translated, k=k, metadata_filter=metadata_filter)
+        # Translate once, embed once (batched with concurrent requests), then search
+        results = await search_service.search_by_text(
+            translated, k=k, metadata_filter=metadata_filter, score_threshold=score_threshold
+        )
 
         log.info("Text search completed", total_results=len(results.points))
 
-        resp = [
-            {
-                "filename": p.payload.get("filename"),
-                "path": p.payload.get("path"),
-                "category": p.payload.get("category"),
-                "score": p.score,
-            }
-            for p in results.points
-        ]
+        resp = _serialize_points(results.points)
 
         folder = None
         if save_results and results.points:
-            folder = search_service.save_results(results)
+            folder = await run_in_threadpool(search_service.save_results, results)
             log.info("Search results saved locally", folder=folder)
 
         return {"query": q, "translated": translated, "k": k, "saved_folder": folder, "results": resp}
@@ -113,14 +137,51 @@ def search_text_endpoint(
         return JSONResponse(status_code=500, content={"error": str(e), "type": type(e).__name__})
 
 
+# ---------------------------------------------------------
+# BATCHED TEXT SEARCH ENDPOINT
+# ---------------------------------------------------------
+@app.get("/search-texts")
+async def search_texts_endpoint(
+    q: List[str] = Query(..., description="One or more queries (repeat the parameter)"),
+    k: int = 5,
+    category: Optional[str] = None,
+    score_threshold: Optional[float] = Query(None, description="Minimum cosine similarity"),
+):
+    log.info("Batch text search request received", total_queries=len(q), top_k=k, category=category)
+
+    try:
+        # LLM round trips run concurrently instead of one after another
+        translated = await asyncio.gather(*(run_in_threadpool(translate_query, query) for query in q))
+
+        metadata_filter = {"category": category} if category else None
+
+        # One CLIP pass for the uncached queries and one Qdrant request for all
+        responses = await search_service.search_by_texts(
+            translated, k=k, metadata_filter=metadata_filter, score_threshold=score_threshold
+        )
+
+        return {
+            "k": k,
+            "results": [
+                {"query": query, "translated": caption, "results": _serialize_points(response.points)}
+                for query, caption, response in zip(q, translated, responses)
+            ],
+        }
+
+    except Exception as e:
+        log.error("Batch text search failed", total_queries=len(q), error=str(e))
+        return JSONResponse(status_code=500, content={"error": str(e), "type": type(e).__name__})
+
+
 # ---------------------------------------------------------
 # IMAGE SEARCH ENDPOINT
 # ---------------------------------------------------------
 @app.post("/search-image")
-def search_image_endpoint(
+async def search_image_endpoint(
     file: UploadFile = File(...),
     k: int = 5,
     category: Optional[str] = None,
+    score_threshold: Optional[float] = Query(None, description="Minimum cosine similarity"),
     save_results: bool = False,
 ):
     log.info("Image search request received", filename=file.filename)
@@ -129,34 +190,27 @@ def search_image_endpoint(
         if not file.content_type.startswith("image/"):
             return JSONResponse(status_code=400, content={"error": "Only image files allowed"})
 
-        Config.QUERY_IMAGE_ROOT.mkdir(parents=True, exist_ok=True)
-        query_path = Config.QUERY_IMAGE_ROOT / file.filename
-
-        with query_path.open("wb") as f:
-            shutil.copyfileobj(file.file, f)
+        # Decoded from memory: nothing is written to disk per query. Image.open
+        # only parses the header here; pixels are decoded on the embedder's pool.
+        data = await file.read()
+        query_image = Image.open(io.BytesIO(data))
 
-        log.info("Uploaded query image saved", path=str(query_path))
+        log.info("Uploaded query image received", filename=file.filename, size_bytes=len(data))
 
         metadata_filter = {"category": category} if category else None
 
-        results = search_service.search_by_image(str(query_path), k=k, metadata_filter=metadata_filter)
+        results = await search_service.search_by_image(
+            query_image, k=k, metadata_filter=metadata_filter, score_threshold=score_threshold
+        )
 
-        resp = [
-            {
-                "filename": p.payload.get("filename"),
-                "path": p.payload.get("path"),
-                "category": p.payload.get("category"),
-                "score": p.score,
-            }
-            for p in results.points
-        ]
+        resp = _serialize_points(results.points)
 
         folder = None
         if save_results and results.points:
-            folder = search_service.save_results(results)
+            folder = await run_in_threadpool(search_service.save_results, results)
             log.info("Search results saved locally", folder=folder)
 
-        return {"query_image": str(query_path), "k": k, "saved_folder": folder, "results": resp}
+        return {"query_image": file.filename, "k": k, "saved_folder": folder, "results": resp}
 
     except Exception as e:
         log.error("Image search failed", filename=file.filename, error=str(e))
@@ -0,0 +1,120 @@
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from semantic_image_search.backend.config import Config
+from semantic_image_search.backend.logger import GLOBAL_LOGGER as log
+from semantic_image_search.backend.exception.custom_exception import SemanticImageSearchException
+
+
+class _ImageTower(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixels):
+        return self.model.encode_image(pixels)
+
+
+class _TextTower(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, tokens):
+        return self.model.encode_text(tokens)
+
+
+class OnnxClipEncoder:
+    """
+    CPU encoder running the CLIP image/text towers as int8 ONNX models.
+    Towers are exported and dynamically quantized once, then reused
+    from Config.ONNX_DIR on later starts.
+    """
+
+    def __init__(self, model):
+        try:
+            import onnxruntime as ort
+
+        except ImportError as e:
+            log.error("onnxruntime is not installed", backend="onnx")
+            raise SemanticImageSearchException(
+                "EMBED_BACKEND=onnx requires the 'onnx' extra (onnx, onnxruntime)", e
+            )
+
+        self.model_dir = Path(Config.ONNX_DIR) / f"{Config.CLIP_MODEL_NAME}-{Config.CLIP_CHECKPOINT}"
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+
+        image_size = model.visual.image_size
+        height, width = (image_size, image_size) if isinstance(image_size, int) else image_size
+
+        image_path = self._ensure_quantized(
+            "image",
+            _ImageTower(model),
+            torch.zeros(1, 3, height, width),
+            input_name="pixels",
+        )
+        text_path = self._ensure_quantized(
+            "text",
+            _TextTower(model),
+            torch.zeros(1, model.context_length, dtype=torch.long),
+            input_name="tokens",
+        )
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = Config.TORCH_THREADS
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        providers = ["CPUExecutionProvider"]
+        self.image_session = ort.InferenceSession(str(image_path), options, providers=providers)
+        self.text_session = ort.InferenceSession(str(text_path), options, providers=providers)
+
+        log.info("ONNX CLIP encoder ready", model_dir=str(self.model_dir))
+
+    def _ensure_quantized(self, name: str, tower: torch.nn.Module, example: torch.Tensor, input_name: str) -> Path:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        fp32_path = self.model_dir / f"{name}.onnx"
+        int8_path = self.model_dir / f"{name}.int8.onnx"
+
+        if int8_path.exists():
+            return int8_path
+
+        log.info("Exporting CLIP tower to ONNX", tower=name, path=str(fp32_path))
+
+        # ONNX replaces torch inference for this process, so moving the
+        # shared model to fp32/CPU in place for the export is safe.
+        tower = tower.float().cpu().eval()
+
+        # The TorchScript exporter (dynamo=False) needs no onnxscript. With the
+        # MHA fast path on, eval-mode attention traces to
+        # aten::_native_multi_head_attention, which opset 17 cannot express.
+        fastpath = torch.backends.mha.get_fastpath_enabled()
+        torch.backends.mha.set_fastpath_enabled(False)
+        try:
+            torch.onnx.export(
+                tower,
+                (example,),
+                str(fp32_path),
+                input_names=[input_name],
+                output_names=["features"],
+                dynamic_axes={input_name: {0: "batch"}, "features": {0: "batch"}},
+                opset_version=17,
+                dynamo=False,
+            )
+        finally:
+            torch.backends.mha.set_fastpath_enabled(fastpath)
+
+        log.info("Quantizing ONNX tower to int8", tower=name, path=str(int8_path))
+        quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+        return int8_path
+
+    def encode_image(self, pixels: np.ndarray) -> np.ndarray:
+        pixels = np.ascontiguousarray(pixels, dtype=np.float32)
+        return self.image_session.run(None, {"pixels": pixels})[0]
+
+    def encode_text(self, tokens: np.ndarray) -> np.ndarray:
+        tokens = np.ascontiguousarray(tokens, dtype=np.int64)
+        return self.text_session.run(None, {"tokens": tokens})[0]
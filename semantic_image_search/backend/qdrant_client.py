@@ -1,4 +1,4 @@
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.http import models
 from semantic_image_search.backend.config import Config
 from semantic_image_search.backend.logger import GLOBAL_LOGGER as log
@@ -10,7 +10,17 @@ class QdrantClientManager:
     Qdrant Client Manager (Singleton)
     """
 
+    # Name of the CLIP vector in the collection schema; points and queries must use it.
+    VECTOR_NAME = "default"
+
+    # Payload fields used in search filters
+    KEYWORD_PAYLOAD_FIELDS = Config.KNOWN_FILTER_KEYS
+
     _client = None
+    _async_client = None
+
+    # Transport the sync client settled on; the async client follows it
+    _use_grpc = False
 
     @classmethod
     def get_client(cls) -> QdrantClient:
@@ -26,14 +36,12 @@ class QdrantClientManager:
             log.info(
                 "Initializing Qdrant client",
                 url=Config.QDRANT_URL,
-                using_api_key=bool(Config.QDRANT_API_KEY)
+                using_api_key=bool(Config.QDRANT_API_KEY),
+                prefer_grpc=Config.QDRANT_PREFER_GRPC,
             )
 
             try:
-                cls._client = QdrantClient(
-                    url=Config.QDRANT_URL,
-                    api_key=Config.QDRANT_API_KEY,
-                )
+                cls._client = cls._connect(prefer_grpc=Config.QDRANT_PREFER_GRPC)
                 log.info("Qdrant client initialized successfully")
 
             except Exception as e:
@@ -42,6 +50,68 @@ class QdrantClientManager:
 
         return cls._client
 
+    @classmethod
+    def _connect(cls, prefer_grpc: bool) -> QdrantClient:
+        """
+        Build one long-lived client. With gRPC, a cheap probe call verifies
+        the server exposes the gRPC port; otherwise fall back to HTTP.
+        """
+        client = QdrantClient(
+            url=Config.QDRANT_URL,
+            api_key=Config.QDRANT_API_KEY,
+            prefer_grpc=prefer_grpc,
+            grpc_port=Config.QDRANT_GRPC_PORT,
+            timeout=Config.QDRANT_TIMEOUT,
+        )
+
+        cls._use_grpc = prefer_grpc
+        if not prefer_grpc:
+            return client
+
+        try:
+            client.get_collections()
+            return client
+
+        except Exception as e:
+            log.warning(
+                "Qdrant gRPC connection failed, falling back to HTTP",
+                grpc_port=Config.QDRANT_GRPC_PORT,
+                error=str(e),
+            )
+            client.close()
+            return cls._connect(prefer_grpc=False)
+
+    @classmethod
+    def get_async_client(cls) -> AsyncQdrantClient:
+        """Lazy initialize the async Qdrant client (used for searches)"""
+        if cls._async_client is None:
+
+            # Reuse the sync client's gRPC probe instead of probing again
+            cls.get_client()
+
+            log.info(
+                "Initializing async Qdrant client",
+                url=Config.QDRANT_URL,
+                using_api_key=bool(Config.QDRANT_API_KEY),
+                prefer_grpc=cls._use_grpc,
+            )
+
+            try:
+                cls._async_client = AsyncQdrantClient(
+                    url=Config.QDRANT_URL,
+                    api_key=Config.QDRANT_API_KEY,
+                    prefer_grpc=cls._use_grpc,
+                    grpc_port=Config.QDRANT_GRPC_PORT,
+                    timeout=Config.QDRANT_TIMEOUT,
+                )
+                log.info("Async Qdrant client initialized successfully")
+
+            except Exception as e:
+                log.error("Failed to initialize async Qdrant client", error=str(e))
+                raise SemanticImageSearchException("Failed to init async Qdrant client", e)
+
+        return cls._async_client
+
     @classmethod
     def ensure_collection(cls):
         """Ensure Qdrant collection exists"""
@@ -61,17 +131,29 @@ class QdrantClientManager:
                     collection=Config.QDRANT_COLLECTION,
                     vector_size=Config.VECTOR_SIZE,
                     distance="COSINE",
+                    quantization=Config.QDRANT_QUANTIZATION,
+                    hnsw_on_disk=Config.HNSW_ON_DISK,
                 )
 
                 client.create_collection(
                     collection_name=Config.QDRANT_COLLECTION,
-                    vectors={
-                        "default": models.VectorParams(
+                    vectors_config={
+                        cls.VECTOR_NAME: models.VectorParams(
                             size=Config.VECTOR_SIZE,
                             distance=models.Distance.COSINE,
-                            on_disk=True,   # important for large datasets
+                            on_disk=True,   # raw fp32 vectors are memmapped
                         )
                     },
+                    on_disk_payload=True,
+                    # Graph stays in RAM by default so traversal never hits disk;
+                    # HNSW_ON_DISK=true trades that for headroom on 10M+ points
+                    hnsw_config=models.HnswConfigDiff(
+                        on_disk=Config.HNSW_ON_DISK,
+                        m=16,
+                        ef_construct=128,
+                    ),
+                    # Quantized copies stay in RAM for scoring; raw fp32 vectors stay on disk
+                    quantization_config=cls._quantization_config(),
                 )
 
                 log.info("Qdrant collection created", collection=Config.QDRANT_COLLECTION)
@@ -82,10 +164,47 @@ class QdrantClientManager:
                     collection=Config.QDRANT_COLLECTION,
                 )
 
+            cls.ensure_payload_indexes()
+
         except Exception as e:
             log.error("Failed to ensure Qdrant collection", error=str(e))
             raise SemanticImageSearchException("Failed to ensure Qdrant collection", e)
 
+    @staticmethod
+    def _quantization_config():
+        """Binary (1 bit/dim, default) or int8 scalar quantization, kept in RAM"""
+        if Config.QDRANT_QUANTIZATION == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True,
+                )
+            )
+
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+
+    @classmethod
+    def ensure_payload_indexes(cls):
+        """Index filterable payload fields so filtered searches skip full scans"""
+
+        client = cls.get_client()
+
+        for field_name in cls.KEYWORD_PAYLOAD_FIELDS:
+            try:
+                client.create_payload_index(
+                    collection_name=Config.QDRANT_COLLECTION,
+                    field_name=field_name,
+                    field_schema=models.PayloadSchemaType.KEYWORD,
+                )
+                log.info("Payload index ensured", collection=Config.QDRANT_COLLECTION, field=field_name)
+
+            except Exception as e:
+                # Already indexed (or not supported by the server): searches still work, just unindexed
+                log.warning("Could not create payload index", field=field_name, error=str(e))
+
 
 if __name__ == "__main__":
     client = QdrantClientManager.get_client()
@@ -1,28 +1,11 @@
+import functools
 from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
 from semantic_image_search.backend.config import Config
 from semantic_image_search.backend.logger import GLOBAL_LOGGER as log
 from semantic_image_search.backend.exception.custom_exception import SemanticImageSearchException
 
 
-class QueryTranslator:
-    """
-    LLM-based Query Rewriter for CLIP-style image caption search.
-    """
-
-    def __init__(self):
-        try:
-            log.info("Initializing QueryTranslator...", model=Config.OPENAI_MODEL)
-
-            self.llm = ChatOpenAI(
-                model=Config.OPENAI_MODEL,
-                temperature=0,
-                timeout=20,     # prevents API hangs
-            )
-
-            self.prompt_template = PromptTemplate(
-                input_variables=["input_query"],
-                template="""
+PROMPT_TEXT = """
 You are an expert at rewriting queries for the CLIP image–text model.
 
 Goal:
@@ -40,9 +23,28 @@ Guidelines:
 User Query: {input_query}
 
 Respond with only the rewritten caption.
-                """.strip(),
+""".strip()
+
+
+class QueryTranslator:
+    """
+    LLM-based Query Rewriter for CLIP-style image caption search.
+    """
+
+    def __init__(self):
+        try:
+            log.info("Initializing QueryTranslator...", model=Config.OPENAI_MODEL)
+
+            self.llm = ChatOpenAI(
+                model=Config.OPENAI_MODEL,
+                temperature=0,
+                timeout=20,     # prevents API hangs
             )
 
+            # Template is fixed: bind str.format once instead of going through
+            # PromptTemplate's validation on every request.
+            self._format = PROMPT_TEXT.format
+
             log.info("QueryTranslator initialized successfully")
 
         except Exception as e:
@@ -58,7 +60,7 @@ Respond with only the rewritten caption.
         log.info("Translating query", input_query=user_query)
 
         try:
-            prompt = self.prompt_template.format(input_query=user_query)
+            prompt = self._format(input_query=user_query)
             log.info("Sending translation prompt to LLM")
 
             # SAFER & RECOMMENDED METHOD
@@ -79,8 +81,15 @@ Respond with only the rewritten caption.
 # ---- Lazy Singleton ----
 _translator_instance = None
 
-def translate_query(user_query: str) -> str:
+def get_translator() -> QueryTranslator:
     global _translator_instance
     if _translator_instance is None:
         _translator_instance = QueryTranslator()
-    return _translator_instance.translate(user_query)
+    return _translator_instance
+
+
+# Repeated queries skip the LLM round trip entirely
+@functools.lru_cache(maxsize=1024)
+def translate_query(user_query: str) -> str:
+    return get_translator().translate(user_query)
+
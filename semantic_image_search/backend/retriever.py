@@ -1,6 +1,10 @@
 import uuid
+import shutil
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Sequence, Tuple
 
 from qdrant_client.http import models
 from PIL import Image
@@ -8,13 +12,28 @@ from PIL import Image
 from semantic_image_search.backend.config import Config
 from semantic_image_search.backend.qdrant_client import QdrantClientManager
 from semantic_image_search.backend.embeddings import (
-    embed_text,
-    embed_single_image,
+    ImageInput,
+    get_batching_embedder,
 )
 from semantic_image_search.backend.logger import GLOBAL_LOGGER as log
 from semantic_image_search.backend.exception.custom_exception import SemanticImageSearchException
 
 
+# Formats copied as-is (when no larger than THUMBNAIL_SIZE) instead of re-encoded
+PASSTHROUGH_SUFFIXES = frozenset({".png", ".jpg", ".jpeg", ".webp"})
+
+
+@lru_cache(maxsize=1024)
+def _build_filter(frozen_items: Tuple[Tuple[str, Any], ...]) -> models.Filter:
+    """Exact-match filter for the given (key, value) pairs; identical filters share one object."""
+    return models.Filter(
+        must=[
+            models.FieldCondition(key=key, match=models.MatchValue(value=value))
+            for key, value in frozen_items
+        ]
+    )
+
+
 class ImageSearchService:
     """
     High-level abstraction for semantic image search.
@@ -24,17 +43,32 @@ class ImageSearchService:
       - Saving retrieved results
     """
 
+    # Payload returned per hit by default: what the API serializes and
+    # save_results reads. Everything else stays on the Qdrant side.
+    RESULT_PAYLOAD_FIELDS = ("path", "filename", "category")
+
     def __init__(self):
         log.info("Initializing ImageSearchService")
 
         try:
-            # Load and ensure Qdrant collection
-            self.client = QdrantClientManager.get_client()
+            # Load and ensure Qdrant collection; searches go through the async
+            # client so one event loop can keep many queries in flight
+            self.async_client = QdrantClientManager.get_async_client()
             QdrantClientManager.ensure_collection()
 
             self.collection = Config.QDRANT_COLLECTION
             self.retrieved_root = Config.RETRIEVED_ROOT
 
+            # Result files are written concurrently; the work is I/O bound
+            self.save_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="save-results")
+
+            # Scan candidates with the quantized vectors, then rescore the
+            # oversampled top-k against the full-precision originals
+            self.quantization_params = models.QuantizationSearchParams(
+                rescore=True,
+                oversampling=Config.QUANTIZATION_OVERSAMPLING,
+            )
+
             log.info(
                 "ImageSearchService initialized",
                 collection=self.collection,
@@ -45,119 +79,217 @@ class ImageSearchService:
             log.error("Failed to initialize ImageSearchService", error=str(e))
             raise SemanticImageSearchException("Failed to initialize ImageSearchService", e)
 
+    def _query_filter(self, metadata_filter: Optional[Dict[str, Any]]) -> Optional[models.Filter]:
+        if not metadata_filter:
+            return None
+        # Sorted so the same filter in any key order hits the cache
+        return _build_filter(tuple(sorted(metadata_filter.items())))
+
+    def _search_params(self, k: int, hnsw_ef: Optional[int]) -> models.SearchParams:
+        # Beam sized to the request instead of the collection default
+        return models.SearchParams(
+            hnsw_ef=hnsw_ef or max(k * 4, 64),
+            quantization=self.quantization_params,
+        )
+
+    def _payload_selector(self, payload_fields: Optional[List[str]]) -> models.PayloadSelectorInclude:
+        return models.PayloadSelectorInclude(
+            include=list(payload_fields or self.RESULT_PAYLOAD_FIELDS)
+        )
+
     # ------------------------------------------------------------------
-    # TEXT → IMAGE SEARCH
+    # VECTOR → IMAGE SEARCH
     # ------------------------------------------------------------------
-    def search_by_text(
+    async def search_by_vector(
         self,
-        query_text: str,
+        vector: Sequence[float],
         k: int = 5,
         metadata_filter: Optional[Dict[str, Any]] = None,
+        payload_fields: Optional[List[str]] = None,
+        hnsw_ef: Optional[int] = None,
+        score_threshold: Optional[float] = None,
     ):
-        log.info(
-            "Text search started",
-            query_text=query_text,
-            top_k=k,
-            filter=metadata_filter
-        )
+        """Search with a pre-computed CLIP vector (no translation, no re-embedding)."""
+        log.info("Vector search started", top_k=k, filter=metadata_filter)
 
         try:
-            # Convert text query into embedding vector
-            vector = embed_text(query_text)
-
-            # Construct metadata filter (optional)
-            q_filter = None
-            if metadata_filter:
-                must_conditions = []
-                for key, value in metadata_filter.items():
-                    must_conditions.append(
-                        models.FieldCondition(
-                            key=key,
-                            match=models.MatchValue(value=value)
-                        )
-                    )
-
-                q_filter = models.Filter(must=must_conditions)
-
             # Perform vector search
-            results = self.client.query_points(
+            results = await self.async_client.query_points(
                 collection_name=self.collection,
                 query=vector,
+                using=QdrantClientManager.VECTOR_NAME,
+                query_filter=self._query_filter(metadata_filter),
                 limit=k,
-                with_payload=True,
+                search_params=self._search_params(k, hnsw_ef),
+                score_threshold=score_threshold,
+                with_payload=self._payload_selector(payload_fields),
                 with_vectors=False
             )
 
-            log.info(
-                "Text search completed",
-                query_text=query_text,
-                total_results=len(results.points)
-            )
+            log.info("Vector search completed", total_results=len(results.points))
 
             return results
 
+        except Exception as e:
+            log.error("Vector search failed", error=str(e))
+            raise SemanticImageSearchException("Vector search failed", e)
+
+    # ------------------------------------------------------------------
+    # TEXT → IMAGE SEARCH
+    # ------------------------------------------------------------------
+    async def search_by_text(
+        self,
+        query_text: str,
+        k: int = 5,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        payload_fields: Optional[List[str]] = None,
+        hnsw_ef: Optional[int] = None,
+        score_threshold: Optional[float] = None,
+    ):
+        log.info(
+            "Text search started",
+            query_text=query_text,
+            top_k=k,
+            filter=metadata_filter
+        )
+
+        try:
+            # Convert text query into embedding vector (micro-batched with
+            # other in-flight requests)
+            vector = await get_batching_embedder().embed_text(query_text)
+
         except Exception as e:
             log.error("Text search failed", query_text=query_text, error=str(e))
             raise SemanticImageSearchException("Text search failed", e)
 
+        return await self.search_by_vector(
+            vector,
+            k=k,
+            metadata_filter=metadata_filter,
+            payload_fields=payload_fields,
+            hnsw_ef=hnsw_ef,
+            score_threshold=score_threshold,
+        )
+
     # ------------------------------------------------------------------
-    # IMAGE → IMAGE SEARCH
+    # BATCHED TEXT → IMAGE SEARCH
     # ------------------------------------------------------------------
-    def search_by_image(
+    async def search_by_texts(
         self,
-        image_path: str,
+        queries: List[str],
         k: int = 5,
         metadata_filter: Optional[Dict[str, Any]] = None,
+        payload_fields: Optional[List[str]] = None,
+        hnsw_ef: Optional[int] = None,
+        score_threshold: Optional[float] = None,
     ):
+        """Embed all queries (cache hits skip CLIP) and search them in one Qdrant request."""
         log.info(
-            "Image search started",
-            image_path=image_path,
+            "Batch text search started",
+            total_queries=len(queries),
             top_k=k,
             filter=metadata_filter
         )
 
         try:
-            # Convert image into embedding vector
-            vector = embed_single_image(image_path)
-
-            # Build filter only if metadata_filter provided
-            q_filter = None
-            if metadata_filter:
-                must_conditions = []
-                for key, value in metadata_filter.items():
-                    must_conditions.append(
-                        models.FieldCondition(
-                            key=key,
-                            match=models.MatchValue(value=value)
-                        )
-                    )
-
-                q_filter = models.Filter(must=must_conditions)
+            # Cached queries resolve immediately; the misses are submitted
+            # together and fused into one micro-batch by the embedder
+            embedder = get_batching_embedder()
+            vectors = await asyncio.gather(*(embedder.embed_text(query) for query in queries))
 
-            # Perform vector search
-            results = self.client.query_points(
+            q_filter = self._query_filter(metadata_filter)
+            search_params = self._search_params(k, hnsw_ef)
+            payload_selector = self._payload_selector(payload_fields)
+
+            requests = [
+                models.QueryRequest(
+                    query=vector,
+                    using=QdrantClientManager.VECTOR_NAME,
+                    filter=q_filter,
+                    limit=k,
+                    params=search_params,
+                    score_threshold=score_threshold,
+                    with_payload=payload_selector,
+                    with_vector=False,
+                )
+                for vector in vectors
+            ]
+
+            responses = await self.async_client.query_batch_points(
                 collection_name=self.collection,
-                query=vector,
-                limit=k,
-                with_payload=True,
-                with_vectors=False
+                requests=requests,
             )
 
-            log.info(
-                "Image search completed",
-                image_path=image_path,
-                total_results=len(results.points)
-            )
+            log.info("Batch text search completed", total_queries=len(responses))
 
-            return results
+            return responses
 
         except Exception as e:
-            log.error("Image search failed", image_path=image_path, error=str(e))
+            log.error("Batch text search failed", total_queries=len(queries), error=str(e))
+            raise SemanticImageSearchException("Batch text search failed", e)
+
+    # ------------------------------------------------------------------
+    # IMAGE → IMAGE SEARCH
+    # ------------------------------------------------------------------
+    async def search_by_image(
+        self,
+        image: ImageInput,
+        k: int = 5,
+        metadata_filter: Optional[Dict[str, Any]] = None,
+        payload_fields: Optional[List[str]] = None,
+        hnsw_ef: Optional[int] = None,
+        score_threshold: Optional[float] = None,
+    ):
+        log.info(
+            "Image search started",
+            image=str(image),
+            top_k=k,
+            filter=metadata_filter
+        )
+
+        try:
+            # Convert image into embedding vector (micro-batched with
+            # other in-flight requests)
+            vector = await get_batching_embedder().embed_image(image)
+
+        except Exception as e:
+            log.error("Image search failed", image=str(image), error=str(e))
             raise SemanticImageSearchException("Image search failed", e)
 
+        return await self.search_by_vector(
+            vector,
+            k=k,
+            metadata_filter=metadata_filter,
+            payload_fields=payload_fields,
+            hnsw_ef=hnsw_ef,
+            score_threshold=score_threshold,
+        )
+
     # ------------------------------------------------------------------
     # SAVE RETRIEVED IMAGES LOCALLY
     # ------------------------------------------------------------------
+    @staticmethod
+    def _persist(src_path: str, output_dir: Path, idx: int):
+        src = Path(src_path)
+        suffix = src.suffix.lower()
+        size = (Config.THUMBNAIL_SIZE, Config.THUMBNAIL_SIZE)
+
+        # Image.open only parses the header, so the size check is cheap
+        with Image.open(src) as img:
+            if suffix in PASSTHROUGH_SUFFIXES and max(img.size) <= Config.THUMBNAIL_SIZE:
+                # A real copy (sendfile on Linux), never a link: editing a saved
+                # result must not touch the indexed original
+                shutil.copyfile(src, output_dir / f"result_{idx}{suffix}")
+                return
+
+            # Large or unusual sources: decode at reduced size (libjpeg DCT
+            # scaling for JPEG) and write a WebP thumbnail
+            img.draft("RGB", size)
+            img.thumbnail(size, Image.Resampling.BILINEAR)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+            img.save(output_dir / f"result_{idx}.webp", quality=85, method=4)
+
     def save_results(self, results) -> str:
         output_dir = Path(self.retrieved_root) / uuid.uuid4().hex
 
@@ -170,10 +302,12 @@ class ImageSearchService:
         try:
             output_dir.mkdir(parents=True, exist_ok=True)
 
-            for idx, point in enumerate(results.points):
-                src_path = point.payload["path"]
-                img = Image.open(src_path)
-                img.save(output_dir / f"result_{idx}.png")
+            futures = [
+                self.save_pool.submit(self._persist, point.payload["path"], output_dir, idx)
+                for idx, point in enumerate(results.points)
+            ]
+            for future in futures:
+                future.result()
 
             log.info("Results saved successfully", output_dir=str(output_dir))
             return str(output_dir)
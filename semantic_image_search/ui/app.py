@@ -1,10 +1,21 @@
-import io
 import requests
 import streamlit as st
-from PIL import Image
+from requests.adapters import HTTPAdapter
 
 API_BASE = "http://localhost:8000"
 
+# (connect, read) seconds; search can wait on the LLM translator
+REQUEST_TIMEOUT = (2, 30)
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One keep-alive session per server process, shared across reruns."""
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+    return session
+
+
 st.set_page_config(page_title="Semantic Image Search", layout="wide")
 st.title("Semantic Image Search Engine")
 
@@ -12,23 +23,36 @@ tab1, tab2 = st.tabs(["Search by Text", "Search by Image"])
 
 
 with tab1:
-    query = st.text_input("Enter your search query")
+    multi = st.checkbox("Search several queries at once (one per line)")
+    if multi:
+        query = st.text_area("Enter your search queries, one per line")
+    else:
+        query = st.text_input("Enter your search query")
     k = st.slider("Top-K results", 1, 10, 5)
 
     if st.button("Search Images"):
-        if not query:
+        queries = [q.strip() for q in query.splitlines() if q.strip()] if multi else [query.strip()]
+
+        if not any(queries):
             st.warning("Please enter a query.")
         else:
-            params = {"q": query, "k": k}
-            res = requests.get(f"{API_BASE}/search-text", params=params)
-            data = res.json()
+            if multi:
+                # All lines go out as a single batched request
+                params = {"q": queries, "k": k}
+                res = get_session().get(f"{API_BASE}/search-texts", params=params, timeout=REQUEST_TIMEOUT)
+                batches = res.json().get("results", [])
+            else:
+                params = {"q": queries[0], "k": k}
+                res = get_session().get(f"{API_BASE}/search-text", params=params, timeout=REQUEST_TIMEOUT)
+                batches = [res.json()]
 
-            st.write("Translated Query:", data.get("translated"))
+            for data in batches:
+                st.write("Translated Query:", data.get("translated"))
 
-            cols = st.columns(3)
-            for idx, item in enumerate(data.get("results", [])):
-                with cols[idx % 3]:
-                    st.image(item["path"], caption=f"{item['filename']} (score={item['score']:.3f})")
+                cols = st.columns(3)
+                for idx, item in enumerate(data.get("results", [])):
+                    with cols[idx % 3]:
+                        st.image(item["path"], caption=f"{item['filename']} (score={item['score']:.3f})")
 
 
 with tab2:
@@ -36,16 +60,14 @@ with tab2:
     k2 = st.slider("Top-K results (image query)", 1, 10, 5, key="k_image")
 
     if upload:
-        img = Image.open(upload)
-        st.image(img, caption="Query Image", use_container_width=True)
-
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        buf.seek(0)
+        # Small preview; the original bytes go to the API untouched
+        st.image(upload, caption="Query Image", width=256)
 
         if st.button("Find Similar Images"):
-            files = {"file": ("query.png", buf, "image/png")}
-            res = requests.post(f"{API_BASE}/search-image", files=files, params={"k": k2})
+            files = {"file": (upload.name, upload.getvalue(), upload.type)}
+            res = get_session().post(
+                f"{API_BASE}/search-image", files=files, params={"k": k2}, timeout=REQUEST_TIMEOUT
+            )
             data = res.json()
 
             cols = st.columns(3)